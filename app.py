@@ -15,21 +15,57 @@ from visualizations.charts import (
     create_bar_chart,
     create_comparison_bar_chart,
     create_growth_rate_chart,
-    create_prediction_chart
+    create_prediction_chart,
+    make_color_map
 )
 from utils.helpers import (
     format_large_number,
+    format_large_number_series,
     format_percentage,
     calculate_statistics,
     calculate_cagr,
-    get_latest_values,
-    save_data_cache,
-    load_data_cache
+    get_latest_values
 )
 from utils.explanations import generate_explanations
 from models.predictor import gdp_predictor
 
 
+# Country selector options, built once per process instead of on every rerun
+_COUNTRY_OPTIONS = list(wb_api.POPULAR_COUNTRIES.keys())
+_COUNTRY_FORMAT = {code: f"{name} ({code})" for code, name in wb_api.POPULAR_COUNTRIES.items()}
+
+
+# Value display kinds, resolved once per indicator at import
+VALUE_PERCENTAGE = "percentage"
+VALUE_LARGE = "large"
+VALUE_PLAIN = "plain"
+
+
+def _value_kind(indicator_key):
+    """Classify an indicator key by how its values should be displayed"""
+    if 'pct' in indicator_key or 'rate' in indicator_key or 'growth' in indicator_key:
+        return VALUE_PERCENTAGE
+    if 'population' in indicator_key or 'gdp' in indicator_key or 'gni' in indicator_key:
+        return VALUE_LARGE
+    return VALUE_PLAIN
+
+
+_VALUE_KIND = {key: _value_kind(key) for key in wb_api.INDICATORS}
+_VALUE_FMT = {
+    VALUE_PERCENTAGE: format_percentage,
+    VALUE_LARGE: format_large_number,
+    VALUE_PLAIN: lambda x: f"{x:,.2f}"
+}
+
+
+# Dashboard views
+TAB_TRENDS = "📈 Trends"
+TAB_STATISTICS = "📊 Statistics"
+TAB_ANALYSIS = "🔍 Analysis"
+TAB_DATA = "📥 Data"
+TABS = [TAB_TRENDS, TAB_STATISTICS, TAB_ANALYSIS, TAB_DATA]
+
+
 # Page configuration
 st.set_page_config(
     page_title="Global Economic Trends Dashboard",
@@ -76,24 +112,17 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-@st.cache_data(ttl=86400)  # Cache for 24 hours
+@st.cache_data(ttl=86400, show_spinner=False)  # Cache for 24 hours, keyed by arguments
 def fetch_data(indicator_key, countries, start_year, end_year):
     """Fetch and cache data from World Bank API"""
-    cache_key = f"{indicator_key}_{'_'.join(countries)}_{start_year}_{end_year}"
-    
-    # Try loading from cache
-    cached_data = load_data_cache(cache_key)
-    if cached_data is not None:
-        return cached_data
-    
-    # Fetch fresh data using the new generic method
-    data = wb_api.fetch_by_indicator_key(indicator_key, countries, start_year, end_year)
-    
-    # Save to cache
-    if not data.empty:
-        save_data_cache(data, cache_key)
-    
-    return data
+    return wb_api.fetch_by_indicator_key(indicator_key, countries, start_year, end_year)
+
+
+@st.cache_data(ttl=86400)
+def data_csv_bytes(indicator_key, countries, start_year, end_year):
+    """UTF-8 CSV export of the fetched data, cached so reruns skip re-encoding"""
+    data = fetch_data(indicator_key, list(countries), start_year, end_year)
+    return data.to_csv(index=False).encode('utf-8')
 
 
 def main():
@@ -109,16 +138,13 @@ def main():
     # Country selection
     st.sidebar.subheader("Select Countries")
     
-    # Get available countries
-    all_countries = wb_api.POPULAR_COUNTRIES
-    
     # Country selection with popular defaults
     default_countries = ['IND']
     selected_country_codes = st.sidebar.multiselect(
         "Choose countries to compare:",
-        options=list(all_countries.keys()),
+        options=_COUNTRY_OPTIONS,
         default=default_countries,
-        format_func=lambda x: f"{all_countries[x]} ({x})"
+        format_func=_COUNTRY_FORMAT.__getitem__
     )
     
     if not selected_country_codes:
@@ -220,37 +246,47 @@ def main():
     # Latest values
     latest = get_latest_values(df)
     
+    # Smart formatting based on indicator type
+    value_kind = _VALUE_KIND[indicator_key]
+    value_fmt = _VALUE_FMT[value_kind]
+    
     # Create metric cards
     cols = st.columns(min(len(selected_country_codes), 4))
-    for idx, (_, row) in enumerate(latest.iterrows()):
+    countries = latest['country'].to_numpy()
+    years = latest['year'].to_numpy()
+    values = latest['value'].to_numpy()
+    for idx in range(len(countries)):
         with cols[idx % 4]:
-            # Smart formatting based on indicator type
-            if 'pct' in indicator_key or 'rate' in indicator_key or 'growth' in indicator_key:
-                value_str = format_percentage(row['value'])
-            elif 'population' in indicator_key or 'gdp' in indicator_key or 'gni' in indicator_key:
-                value_str = format_large_number(row['value'])
-            else:
-                value_str = f"{row['value']:,.2f}"
-            
             st.metric(
-                label=f"{row['country']} ({int(row['year'])})",
-                value=value_str
+                label=f"{countries[idx]} ({int(years[idx])})",
+                value=value_fmt(values[idx])
             )
     
-    # Main visualization tabs
-    tab1, tab2, tab3, tab4 = st.tabs(["📈 Trends", "📊 Statistics", "🔍 Analysis", "📥 Data"])
+    # Determine appropriate y-axis label
+    y_label = indicator_name
+    
+    # Same color for a country in every chart
+    color_map = make_color_map(df['country'].unique())
+    
+    # Main visualization tabs. st.tabs renders every tab body on each rerun,
+    # so a horizontal radio selects the view and only that one is built.
+    active_tab = st.radio(
+        "View",
+        options=TABS,
+        horizontal=True,
+        key="active_tab",
+        label_visibility="collapsed"
+    )
     
-    with tab1:
+    if active_tab == TAB_TRENDS:
         st.subheader(f"{indicator_name} Over Time")
         
-        # Determine appropriate y-axis label
-        y_label = indicator_name
-        
         fig_line = create_line_chart(
             df,
             f"{indicator_name} Trends ({start_year}-{end_year})",
             y_label,
-            height=500
+            height=500,
+            color_map=color_map
         )
         st.plotly_chart(fig_line, use_container_width=True)
 
@@ -270,7 +306,8 @@ def main():
             fig_growth = create_growth_rate_chart(
                 df,
                 f"{indicator_name} Growth Rate ({start_year}-{end_year})",
-                height=450
+                height=450,
+                color_map=color_map
             )
             st.plotly_chart(fig_growth, use_container_width=True)
         
@@ -296,20 +333,20 @@ def main():
                 )
                 st.plotly_chart(fig_comparison, use_container_width=True)
     
-    with tab2:
+    elif active_tab == TAB_STATISTICS:
         st.subheader("Statistical Summary")
         
         # Calculate statistics
         stats = calculate_statistics(df)
         
         # Smart formatting based on indicator type
-        if 'pct' in indicator_key or 'rate' in indicator_key or 'growth' in indicator_key:
+        if value_kind == VALUE_PERCENTAGE:
             for col in ['mean', 'median', 'min', 'max', 'std', 'latest']:
                 stats[col] = stats[col].apply(lambda x: f"{x:.2f}%")
-        elif 'population' in indicator_key or 'gdp' in indicator_key or 'gni' in indicator_key:
+        elif value_kind == VALUE_LARGE:
             for col in ['mean', 'median', 'min', 'max', 'latest']:
-                stats[col] = stats[col].apply(format_large_number)
-            stats['std'] = stats['std'].apply(lambda x: format_large_number(x, 1))
+                stats[col] = format_large_number_series(stats[col])
+            stats['std'] = format_large_number_series(stats['std'], 1)
         else:
             for col in ['mean', 'median', 'min', 'max', 'std', 'latest']:
                 stats[col] = stats[col].apply(lambda x: f"{x:,.2f}")
@@ -335,9 +372,9 @@ def main():
         
         if not cagr_df.empty:
             cagr_display = cagr_df.copy()
-            if 'population' in indicator_key or 'gdp' in indicator_key or 'gni' in indicator_key:
-                cagr_display['start_value'] = cagr_display['start_value'].apply(format_large_number)
-                cagr_display['end_value'] = cagr_display['end_value'].apply(format_large_number)
+            if value_kind == VALUE_LARGE:
+                cagr_display['start_value'] = format_large_number_series(cagr_display['start_value'])
+                cagr_display['end_value'] = format_large_number_series(cagr_display['end_value'])
             else:
                 cagr_display['start_value'] = cagr_display['start_value'].apply(lambda x: f"{x:,.2f}")
                 cagr_display['end_value'] = cagr_display['end_value'].apply(lambda x: f"{x:,.2f}")
@@ -357,7 +394,7 @@ def main():
                 use_container_width=True
             )
     
-    with tab3:
+    elif active_tab == TAB_ANALYSIS:
         if indicator_key == "gdp" and show_prediction:
             st.subheader("🔮 GDP Prediction Model")
             
@@ -373,11 +410,14 @@ def main():
                 st.markdown("### Next Year Predictions")
                 
                 pred_cols = st.columns(min(len(predictions), 4))
-                for idx, (_, row) in enumerate(predictions.iterrows()):
+                pred_countries = predictions['country'].to_numpy()
+                pred_years = predictions['year'].to_numpy()
+                pred_values = predictions['value'].to_numpy()
+                for idx in range(len(pred_countries)):
                     with pred_cols[idx % 4]:
                         st.metric(
-                            label=f"{row['country']} ({int(row['year'])})",
-                            value=format_large_number(row['value']),
+                            label=f"{pred_countries[idx]} ({int(pred_years[idx])})",
+                            value=format_large_number(pred_values[idx]),
                             delta="Predicted"
                         )
                 
@@ -388,7 +428,8 @@ def main():
                     predictions,
                     "GDP with Next Year Prediction",
                     "GDP (Current US$)",
-                    height=500
+                    height=500,
+                    color_map=color_map
                 )
                 st.plotly_chart(fig_pred, use_container_width=True)
                 
@@ -420,7 +461,7 @@ def main():
             )
             st.plotly_chart(fig_ranking, use_container_width=True)
     
-    with tab4:
+    elif active_tab == TAB_DATA:
         st.subheader("Raw Data")
         
         # Display data table
@@ -437,7 +478,7 @@ def main():
         )
         
         # Download button
-        csv = df.to_csv(index=False)
+        csv = data_csv_bytes(indicator_key, tuple(selected_country_codes), start_year, end_year)
         st.download_button(
             label="📥 Download Data as CSV",
             data=csv,
@@ -29,9 +29,10 @@ class GDPPredictor:
         self.models = {}
         self.metrics = {}
         
-        for country in df['country'].unique():
-            country_data = df[df['country'] == country].sort_values('year')
-            
+        # Sort once so each group is already in year order
+        df_sorted = df.sort_values(['country', 'year'], kind='mergesort')
+        
+        for country, country_data in df_sorted.groupby('country', sort=False, observed=True):
             if len(country_data) < 3:  # Need at least 3 points for training
                 continue
             
@@ -97,12 +98,12 @@ class GDPPredictor:
         
         predictions = []
         
-        for country in df['country'].unique():
+        last_years = df.groupby('country', sort=False, observed=True)['year'].max()
+        
+        for country, last_year in last_years.items():
             if country not in self.models:
                 continue
             
-            country_data = df[df['country'] == country]
-            last_year = country_data['year'].max()
             next_year = last_year + 1
             
             pred = self.predict(country, [next_year])
@@ -4,9 +4,13 @@ Fetches macroeconomic indicators from the World Bank Open Data API
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
+import numpy as np
 import pandas as pd
-from typing import List, Dict
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Tuple
 
 
 class WorldBankAPI:
@@ -14,6 +18,10 @@ class WorldBankAPI:
     
     BASE_URL = "https://api.worldbank.org/v2"
     
+    # Countries per batched request (keeps URLs well within length limits)
+    MAX_COUNTRIES_PER_REQUEST = 40
+    MAX_WORKERS = 8
+    
     # World Bank Indicator Codes organized by category
     INDICATORS = {
         # POPULATION & DEMOGRAPHICS
@@ -405,6 +413,18 @@ class WorldBankAPI:
     
     def __init__(self):
         self.session = requests.Session()
+        
+        # Pooled keep-alive connections, retrying transient and rate-limit errors
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=[429, 500, 502, 503, 504]
+            )
+        )
+        self.session.mount("https://", adapter)
     
     def fetch_indicator(
         self,
@@ -423,67 +443,90 @@ class WorldBankAPI:
             end_year: Ending year for data
             
         Returns:
-            DataFrame with columns: country, country_code, year, value
+            DataFrame with columns: country, country_code, year, value,
+            sorted by country and year. Downstream helpers rely on this order.
         """
-        all_data = []
-        
-        for country_code in country_codes:
-            try:
-                data = self._fetch_country_indicator(
-                    indicator_code, 
-                    country_code, 
-                    start_year, 
-                    end_year
-                )
-                all_data.extend(data)
-                time.sleep(0.1)  # Rate limiting - be nice to the API
-            except Exception as e:
-                print(f"Error fetching data for {country_code}: {e}")
-                continue
-        
-        if not all_data:
+        batches = [
+            country_codes[i:i + self.MAX_COUNTRIES_PER_REQUEST]
+            for i in range(0, len(country_codes), self.MAX_COUNTRIES_PER_REQUEST)
+        ]
+        countries, codes, years, values = [], [], [], []
+        
+        if not batches:
             return pd.DataFrame(columns=['country', 'country_code', 'year', 'value'])
         
-        df = pd.DataFrame(all_data)
+        # Batches are network-bound, so fetch them concurrently
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(batches))) as ex:
+            futures = {
+                ex.submit(self._fetch_multi_country, indicator_code, batch, start_year, end_year): batch
+                for batch in batches
+            }
+            for fut in as_completed(futures):
+                try:
+                    batch_countries, batch_codes, batch_years, batch_values = fut.result()
+                except Exception as e:
+                    print(f"Error fetching data for {', '.join(futures[fut])}: {e}")
+                    continue
+                countries.extend(batch_countries)
+                codes.extend(batch_codes)
+                years.extend(batch_years)
+                values.extend(batch_values)
+        
+        if not values:
+            return pd.DataFrame(columns=['country', 'country_code', 'year', 'value'])
+        
+        # Typed columns skip pandas' per-row dtype inference. Years fit in int16;
+        # values stay float64 because the table, CSV export and statistics use
+        # them at full precision (charts narrow them in their own _prep).
+        df = pd.DataFrame({
+            'country': pd.array(countries, dtype='string'),
+            'country_code': pd.array(codes, dtype='string'),
+            'year': np.asarray(years, dtype=np.int16),
+            'value': np.asarray(values, dtype=np.float64)
+        })
         df = df.sort_values(['country', 'year']).reset_index(drop=True)
+        
+        # Few distinct countries repeated per year, so store them as categories
+        df['country'] = df['country'].astype('category')
+        df['country_code'] = df['country_code'].astype('category')
         return df
     
-    def _fetch_country_indicator(
+    def _fetch_multi_country(
         self,
         indicator_code: str,
-        country_code: str,
+        country_codes: List[str],
         start_year: int,
         end_year: int
-    ) -> List[Dict]:
-        """Fetch data for a single country"""
+    ) -> Tuple[list, list, list, list]:
+        """Fetch data for all countries in a single request as column lists"""
         
-        url = f"{self.BASE_URL}/country/{country_code}/indicator/{indicator_code}"
+        # The API accepts semicolon-joined country codes, one request replaces N
+        url = f"{self.BASE_URL}/country/{';'.join(country_codes)}/indicator/{indicator_code}"
         params = {
             "date": f"{start_year}:{end_year}",
             "format": "json",
-            "per_page": 1000
+            "per_page": 32767  # Large enough to avoid pagination
         }
         
         response = self.session.get(url, params=params)
         response.raise_for_status()
         
-        json_data = response.json()
+        json_data = orjson.loads(response.content)
+        
+        countries, codes, years, values = [], [], [], []
         
         # World Bank API returns [metadata, data] array
         if len(json_data) < 2 or json_data[1] is None:
-            return []
+            return countries, codes, years, values
         
-        data_records = []
         for entry in json_data[1]:
             if entry['value'] is not None:
-                data_records.append({
-                    'country': entry['country']['value'],
-                    'country_code': entry['countryiso3code'],
-                    'year': int(entry['date']),
-                    'value': float(entry['value'])
-                })
-        
-        return data_records
+                countries.append(entry['country']['value'])
+                codes.append(entry['countryiso3code'])
+                years.append(int(entry['date']))
+                values.append(float(entry['value']))
+        
+        return countries, codes, years, values
     
     def fetch_by_indicator_key(
         self,
@@ -536,14 +579,12 @@ class WorldBankAPI:
             if len(json_data) < 2:
                 return self.POPULAR_COUNTRIES
             
-            countries = {}
-            for country in json_data[1]:
-                # Filter out regions and aggregates
-                if country['capitalCity']:  # Only actual countries have capitals
-                    code = country['iso2Code']
-                    name = country['name']
-                    if len(code) == 2 or len(code) == 3:  # Valid country codes
-                        countries[code] = name
+            # Only actual countries have capitals (filters out regions and aggregates)
+            countries = {
+                c['iso2Code']: c['name']
+                for c in json_data[1]
+                if c['capitalCity'] and len(c['iso2Code']) in (2, 3)
+            }
             
             return countries if countries else self.POPULAR_COUNTRIES
             
@@ -35,9 +35,11 @@ INDICATOR_CONTEXT_RULES = [
 ]
 
 def _percent_changes(df: pd.DataFrame) -> pd.DataFrame:
-    df_sorted = df.sort_values(['country', 'year']).copy()
-    df_sorted['pct_change'] = df_sorted.groupby('country')['value'].pct_change() * 100
-    return df_sorted
+    # sort_values already returns a new frame, so assign without an extra copy
+    df_sorted = df.sort_values(['country', 'year'])
+    return df_sorted.assign(
+        pct_change=df_sorted.groupby('country', sort=False, observed=True)['value'].pct_change() * 100
+    )
 
 def _is_percentage_indicator(indicator_key: str) -> bool:
     return any(x in indicator_key for x in ["pct", "rate", "growth"])
@@ -55,8 +57,7 @@ def detect_extremes(
     """
     pc_df = _percent_changes(df)
     results = {}
-    for country in pc_df['country'].unique():
-        cdata = pc_df[pc_df['country'] == country]
+    for country, cdata in pc_df.groupby('country', sort=False, observed=True):
         # Exclude first NaN change
         cvalid = cdata.dropna(subset=['pct_change'])
         # Apply significance threshold
@@ -3,9 +3,10 @@ Utility functions for data processing and formatting
 """
 
 import pandas as pd
-import json
+import numpy as np
 import os
-from datetime import datetime
+import time
+from functools import lru_cache
 from typing import Optional
 
 
@@ -23,6 +24,12 @@ def format_large_number(value: float, precision: int = 2) -> str:
     if pd.isna(value):
         return "N/A"
     
+    return _format_large_number_cached(float(value), precision)
+
+
+@lru_cache(maxsize=1024)
+def _format_large_number_cached(value: float, precision: int) -> str:
+    """Memoized body of format_large_number; value must not be NaN"""
     abs_value = abs(value)
     sign = "-" if value < 0 else ""
     
@@ -38,6 +45,32 @@ def format_large_number(value: float, precision: int = 2) -> str:
         return f"{sign}{abs_value:.{precision}f}"
 
 
+def format_large_number_series(s: pd.Series, precision: int = 2) -> pd.Series:
+    """
+    Vectorized format_large_number for a whole Series
+    
+    Args:
+        s: Numeric Series to format
+        precision: Decimal places
+        
+    Returns:
+        Series of formatted strings, same index as the input
+    """
+    v = s.to_numpy(dtype=float)
+    a = np.abs(v)
+    thresholds = [a >= 1e12, a >= 1e9, a >= 1e6, a >= 1e3]
+    
+    sign = np.where(v < 0, '-', '')
+    scaled = np.select(thresholds, [a / 1e12, a / 1e9, a / 1e6, a / 1e3], default=a)
+    suffix = np.select(thresholds, ['T', 'B', 'M', 'K'], default='')
+    
+    fmt = np.char.mod(f'%.{precision}f', scaled)
+    out = np.char.add(np.char.add(sign, fmt), suffix).astype(object)
+    out[np.isnan(v)] = "N/A"
+    
+    return pd.Series(out, index=s.index)
+
+
 def format_percentage(value: float, precision: int = 2) -> str:
     """
     Format percentage values
@@ -59,12 +92,14 @@ def calculate_statistics(df: pd.DataFrame) -> pd.DataFrame:
     Calculate summary statistics for each country
     
     Args:
-        df: DataFrame with columns: country, year, value
+        df: DataFrame with columns: country, year, value, sorted by
+            country and year (as returned by fetch_indicator)
         
     Returns:
         DataFrame with statistics by country
     """
-    stats = df.groupby('country')['value'].agg([
+    # Input is already sorted, so skip groupby's own sort; 'last' is the latest year
+    stats = df.groupby('country', sort=False, observed=True)['value'].agg([
         ('mean', 'mean'),
         ('median', 'median'),
         ('min', 'min'),
@@ -87,7 +122,7 @@ def calculate_growth_rate(df: pd.DataFrame) -> pd.DataFrame:
         DataFrame with growth_rate column added
     """
     df = df.sort_values(['country', 'year'])
-    df['growth_rate'] = df.groupby('country')['value'].pct_change() * 100
+    df['growth_rate'] = df.groupby('country', sort=False, observed=True)['value'].pct_change() * 100
     return df
 
 
@@ -107,48 +142,40 @@ def calculate_cagr(
     Returns:
         DataFrame with CAGR by country
     """
-    results = []
+    df_sorted = df.sort_values(['country', 'year'])
     
-    for country in df['country'].unique():
-        country_data = df[df['country'] == country].sort_values('year')
-        
-        if start_year:
-            start_data = country_data[country_data['year'] == start_year]
-        else:
-            start_data = country_data.iloc[[0]]
-        
-        if end_year:
-            end_data = country_data[country_data['year'] == end_year]
-        else:
-            end_data = country_data.iloc[[-1]]
-        
-        if len(start_data) == 0 or len(end_data) == 0:
-            continue
-        
-        start_val = start_data['value'].iloc[0]
-        end_val = end_data['value'].iloc[0]
-        start_yr = start_data['year'].iloc[0]
-        end_yr = end_data['year'].iloc[0]
-        
-        years = end_yr - start_yr
-        
-        if years > 0 and start_val > 0:
-            cagr = ((end_val / start_val) ** (1 / years) - 1) * 100
-            results.append({
-                'country': country,
-                'start_year': start_yr,
-                'end_year': end_yr,
-                'start_value': start_val,
-                'end_value': end_val,
-                'cagr': cagr
-            })
-    
-    return pd.DataFrame(results)
+    if start_year:
+        df_sorted = df_sorted[df_sorted['year'] >= start_year]
+    if end_year:
+        df_sorted = df_sorted[df_sorted['year'] <= end_year]
+    
+    g = df_sorted.groupby('country', sort=False, observed=True).agg(
+        start_year=('year', 'first'),
+        end_year=('year', 'last'),
+        start_value=('value', 'first'),
+        end_value=('value', 'last')
+    ).reset_index()
+    
+    years = g['end_year'] - g['start_year']
+    mask = (years > 0) & (g['start_value'] > 0)
+    
+    # Requested boundary years must be present for the country
+    if start_year:
+        mask &= g['start_year'] == start_year
+    if end_year:
+        mask &= g['end_year'] == end_year
+    
+    g = g[mask]
+    g = g.assign(
+        cagr=((g['end_value'] / g['start_value']) ** (1 / years[mask]) - 1) * 100
+    )
+    
+    return g.reset_index(drop=True)
 
 
 def save_data_cache(data: pd.DataFrame, filename: str, cache_dir: str = "data"):
     """
-    Save data to cache as JSON
+    Save data to cache as Parquet
     
     Args:
         data: DataFrame to cache
@@ -156,16 +183,9 @@ def save_data_cache(data: pd.DataFrame, filename: str, cache_dir: str = "data"):
         cache_dir: Cache directory
     """
     os.makedirs(cache_dir, exist_ok=True)
-    filepath = os.path.join(cache_dir, f"{filename}.json")
+    filepath = os.path.join(cache_dir, f"{filename}.parquet")
     
-    # Add timestamp
-    cache_data = {
-        'timestamp': datetime.now().isoformat(),
-        'data': data.to_dict(orient='records')
-    }
-    
-    with open(filepath, 'w') as f:
-        json.dump(cache_data, f, indent=2)
+    data.to_parquet(filepath, compression='zstd')
 
 
 def load_data_cache(
@@ -184,23 +204,19 @@ def load_data_cache(
     Returns:
         DataFrame if cache is valid, None otherwise
     """
-    filepath = os.path.join(cache_dir, f"{filename}.json")
+    filepath = os.path.join(cache_dir, f"{filename}.parquet")
     
     if not os.path.exists(filepath):
         return None
     
     try:
-        with open(filepath, 'r') as f:
-            cache_data = json.load(f)
-        
-        # Check cache age
-        cache_time = datetime.fromisoformat(cache_data['timestamp'])
-        age_hours = (datetime.now() - cache_time).total_seconds() / 3600
+        # Check cache age from the file's mtime before reading it
+        age_hours = (time.time() - os.path.getmtime(filepath)) / 3600
         
         if age_hours > max_age_hours:
             return None
         
-        return pd.DataFrame(cache_data['data'])
+        return pd.read_parquet(filepath)
     
     except Exception as e:
         print(f"Error loading cache: {e}")
@@ -234,8 +250,7 @@ def prepare_download_data(df: pd.DataFrame, indicator_name: str) -> pd.DataFrame
     Returns:
         Formatted DataFrame
     """
-    df_download = df.copy()
-    df_download = df_download.rename(columns={
+    df_download = df.rename(columns={
         'country': 'Country',
         'country_code': 'Country Code',
         'year': 'Year',
@@ -250,42 +265,65 @@ def get_latest_values(df: pd.DataFrame) -> pd.DataFrame:
     Get the most recent value for each country
     
     Args:
-        df: DataFrame with columns: country, year, value
+        df: DataFrame with columns: country, year, value, sorted by
+            country and year (as returned by fetch_indicator)
         
     Returns:
         DataFrame with latest values
     """
-    latest = df.sort_values('year').groupby('country').tail(1)
+    # On sorted data the last row of each country is where the next row's country differs
+    country = df['country']
+    latest = df[country != country.shift(-1)]
     return latest.sort_values('value', ascending=False)
 
 
+def _country_value_map(df: pd.DataFrame) -> dict:
+    """Map each country to a (years, values) pair of arrays, in row order"""
+    return {
+        name: (g['year'].to_numpy(), g['value'].to_numpy())
+        for name, g in df.groupby('country', sort=False, observed=True)
+    }
+
+
 def compare_countries(
     df: pd.DataFrame,
     country1: str,
-    country2: str
+    country2: str,
+    value_map: Optional[dict] = None
 ) -> dict:
     """
     Compare statistics between two countries
     
     Args:
-        df: DataFrame with data
+        df: DataFrame with data, sorted by country and year
         country1: First country name
         country2: Second country name
+        value_map: Optional pre-built map from _country_value_map, reused
+            across repeated pairwise comparisons
         
     Returns:
         Dictionary with comparison metrics
     """
-    data1 = df[df['country'] == country1]
-    data2 = df[df['country'] == country2]
+    if value_map is None:
+        value_map = _country_value_map(df)
     
-    if data1.empty or data2.empty:
+    if country1 not in value_map or country2 not in value_map:
         return {}
     
+    y1, v1 = value_map[country1]
+    y2, v2 = value_map[country2]
+    
+    if len(v1) == 0 or len(v2) == 0:
+        return {}
+    
+    # Correlate only the years both countries report, paired by year
+    _, i1, i2 = np.intersect1d(y1, y2, assume_unique=True, return_indices=True)
+    
     return {
         'country1': country1,
         'country2': country2,
-        'mean_diff': data1['value'].mean() - data2['value'].mean(),
-        'median_diff': data1['value'].median() - data2['value'].median(),
-        'latest_diff': data1['value'].iloc[-1] - data2['value'].iloc[-1],
-        'correlation': data1['value'].corr(data2['value']) if len(data1) == len(data2) else None
+        'mean_diff': v1.mean() - v2.mean(),
+        'median_diff': np.median(v1) - np.median(v2),
+        'latest_diff': v1[-1] - v2[-1],
+        'correlation': np.corrcoef(v1[i1], v2[i2])[0, 1] if len(i1) > 1 else None
     }
@@ -1,17 +1,297 @@
 """
 Chart generation functions using Plotly
 """
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+import numpy as np
+import orjson
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import pandas as pd
-from typing import List
+from itertools import cycle
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+try:
+    import datashader as ds
+    import datashader.transfer_functions as tf
+except ImportError:  # Optional: only needed for create_line_chart(backend='datashader')
+    ds = None
+    tf = None
+
+
+# Layout pieces shared by every figure; Plotly copies them on validation
+_COMMON_LAYOUT = dict(template='plotly_white', font=dict(size=12), title_font_size=18)
+_SIDE_LEGEND = dict(orientation="v", yanchor="top", y=1, xanchor="left", x=1.02)
+_GRID_AXIS = dict(showgrid=True, gridcolor='lightgray')
+_ZERO_LINE_AXIS = dict(_GRID_AXIS, zeroline=True, zerolinecolor='red', zerolinewidth=1)
+_CATEGORY_AXIS = dict(tickangle=-45, showgrid=False)
+
+
+# Above this many points, unified hover labels and spike lines dominate
+# interaction cost in the browser
+_DENSE_POINTS = 20_000
+
+
+def _hover_layout(n_points: int) -> dict:
+    """
+    Hover settings scaled to chart density
+    
+    Small charts keep the richer 'x unified' hover. Dense charts fall back to
+    plain 'x' hover with spikes disabled, trading the combined tooltip for
+    responsive interaction.
+    """
+    if n_points > _DENSE_POINTS:
+        return dict(hovermode='x', spikedistance=0)
+    return dict(hovermode='x unified')
+
+
+def _plotted_points(fig: go.Figure) -> int:
+    """Number of points actually drawn by the figure's traces (after LTTB)"""
+    return sum(len(t.x) for t in fig.data if getattr(t, 'x', None) is not None)
+
+
+def _orjson_default(obj):
+    """Fallback for values orjson cannot encode natively (e.g. object-dtype arrays)"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _finalize(fig: go.Figure, prejson: bool) -> Union[go.Figure, bytes]:
+    """Return the figure, or its JSON encoded with orjson when prejson is set"""
+    if not prejson:
+        return fig
+    return orjson.dumps(
+        fig.to_plotly_json(),
+        default=_orjson_default,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    )
+
+
+def _lttb(x: np.ndarray, y: np.ndarray, n_out: int):
+    """
+    Downsample a series with Largest-Triangle-Three-Buckets
+    
+    Keeps the first and last points and, for each bucket in between, the point
+    forming the largest triangle with the previously kept point and the
+    average of the next bucket. Visual shape is preserved with n_out points.
+    
+    Args:
+        x: Sorted x values
+        y: y values
+        n_out: Number of points to keep
+        
+    Returns:
+        Tuple of downsampled (x, y) arrays
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    
+    xf = x.astype(float)
+    yf = y.astype(float)
+    every = (n - 2) / (n_out - 2)
+    bounds = (np.arange(n_out - 1) * every).astype(np.intp) + 1
+    
+    keep = np.empty(n_out, dtype=np.intp)
+    keep[0] = a = 0
+    for i in range(n_out - 2):
+        lo, hi = bounds[i], bounds[i + 1]
+        if i + 2 < len(bounds):
+            next_lo, next_hi = bounds[i + 1], bounds[i + 2]
+        else:
+            next_lo, next_hi = n - 1, n
+        avg_x = xf[next_lo:next_hi].mean()
+        avg_y = yf[next_lo:next_hi].mean()
+        area = np.abs(
+            (xf[a] - avg_x) * (yf[lo:hi] - yf[a])
+            - (xf[a] - xf[lo:hi]) * (avg_y - yf[a])
+        )
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    keep[-1] = n - 1
+    
+    return x[keep], y[keep]
+
+
+_CHART_COLUMNS = ['country', 'year', 'value']
+
+
+def _narrow(values: np.ndarray) -> np.ndarray:
+    """Trace values as float32, halving the bytes serialized into the figure"""
+    return values.astype(np.float32, copy=False)
+
+
+def _prep(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalize chart input, converting only what needs it
+    
+    Columns other than country, year and value are dropped so filters and
+    sorts touch less data. 'country' becomes categorical so grouping and masks
+    work on integer codes, and 'year' is narrowed to int16. 'value' keeps its
+    precision for derived series (e.g. growth rates); builders narrow only the
+    arrays handed to traces (see _narrow).
+    """
+    if len(df.columns) != len(_CHART_COLUMNS):
+        df = df.loc[:, _CHART_COLUMNS]
+    
+    casts = {}
+    if not isinstance(df['country'].dtype, pd.CategoricalDtype):
+        casts['country'] = 'category'
+    if df['year'].dtype != np.int16:
+        casts['year'] = np.int16
+    return df.astype(casts) if casts else df
+
+
+@lru_cache(maxsize=32)
+def _empty_layout(title: str, height: int) -> go.Layout:
+    """Validated layout for the placeholder figure, cached per (title, height)"""
+    return go.Layout(
+        title=title,
+        height=height,
+        template='plotly_white',
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+        annotations=[dict(
+            text='No data',
+            xref='paper',
+            yref='paper',
+            x=0.5,
+            y=0.5,
+            showarrow=False,
+            font=dict(size=16)
+        )]
+    )
+
+
+def _empty_fig(title: str, height: int) -> go.Figure:
+    """
+    Minimal placeholder figure for charts with no data
+    
+    The layout is cached, but each call returns a new figure (with its own
+    copy of the layout) so callers may update it freely.
+    """
+    return go.Figure(layout=_empty_layout(title, height))
+
+
+def make_color_map(countries: Iterable[str]) -> Dict[str, str]:
+    """
+    Assign each country a fixed color from the default Plotly palette
+    
+    Build once and pass as color_map so a country keeps the same color in
+    every figure of a session.
+    
+    Args:
+        countries: Country names in the order colors should be assigned
+        
+    Returns:
+        Dictionary mapping country name to color
+    """
+    return dict(zip(countries, cycle(px.colors.qualitative.Plotly)))
+
+
+def _padded_range(lo: float, hi: float, pad: Optional[float] = None) -> tuple:
+    """
+    (lo, hi) as floats, widened around the value when lo == hi
+    
+    A zero-width range would give datashader a degenerate canvas. pad defaults
+    to 5% of the value (0.5 when the value is 0).
+    """
+    lo, hi = float(lo), float(hi)
+    if lo == hi:
+        pad = pad or abs(lo) * 0.05 or 0.5
+        lo, hi = lo - pad, hi + pad
+    return lo, hi
+
+
+def _datashader_line_figure(
+    df: pd.DataFrame,
+    height: int,
+    color_map: Optional[Dict[str, str]],
+    max_points: int
+) -> go.Figure:
+    """
+    Rasterize per-country lines with datashader into an image-backed figure
+    
+    The lines become a single PNG go.Image, so browser cost scales with
+    pixels rather than points. Transparent LTTB-downsampled traces on top
+    keep hover working, and data-less traces provide the legend.
+    """
+    if ds is None:
+        raise ImportError("backend='datashader' requires the datashader package")
+    
+    groups = list(df.groupby('country', sort=False, observed=True))
+    # Caller colors win; countries missing from a partial map get palette colors
+    color_map = {**make_color_map(country for country, _ in groups), **(color_map or {})}
+    
+    x_range = _padded_range(df['year'].min(), df['year'].max(), pad=0.5)
+    y_range = _padded_range(df['value'].min(), df['value'].max())
+    width, img_height = 1600, height * 2
+    cvs = ds.Canvas(
+        plot_width=width,
+        plot_height=img_height,
+        x_range=x_range,
+        y_range=y_range
+    )
+    
+    images = []
+    overlays = []
+    for country, country_data in groups:
+        data = country_data.astype({'year': np.float64, 'value': np.float64})
+        images.append(tf.shade(cvs.line(data, 'year', 'value'), cmap=color_map[country]))
+        
+        x, y = _lttb(
+            country_data['year'].to_numpy(copy=False),
+            country_data['value'].to_numpy(copy=False),
+            max_points
+        )
+        overlays.append(go.Scattergl(x=x, y=_narrow(y), mode='lines', name=country, opacity=0, showlegend=False))
+        overlays.append(go.Scattergl(
+            x=[None],
+            y=[None],
+            mode='lines',
+            name=country,
+            line=dict(width=2.5, color=color_map[country]),
+            hoverinfo='skip'
+        ))
+    
+    # Ship the raster as a PNG data URI rather than a raw RGBA z array, which
+    # would be larger than the points it replaces. Datashader's row 0 is the
+    # lowest y value; origin='upper' keeps that order so it lines up with y0.
+    png = tf.stack(*images).to_bytesio('png', origin='upper').getvalue()
+    
+    fig = go.Figure(data=[
+        go.Image(
+            source='data:image/png;base64,' + base64.b64encode(png).decode('ascii'),
+            x0=x_range[0],
+            dx=(x_range[1] - x_range[0]) / width,
+            y0=y_range[0],
+            dy=(y_range[1] - y_range[0]) / img_height,
+            hoverinfo='skip'
+        ),
+        *overlays
+    ])
+    
+    # Image traces reverse the y axis by default; keep values increasing upward
+    fig.update_layout(yaxis_autorange=True, xaxis_autorange=True)
+    return fig
+
+
 def create_line_chart(
     df: pd.DataFrame,
     title: str,
     y_label: str,
-    height: int = 500
-) -> go.Figure:
+    height: int = 500,
+    use_webgl: bool = True,
+    max_points: int = 2000,
+    color_map: Optional[Dict[str, str]] = None,
+    backend: str = 'plotly',
+    prejson: bool = False
+) -> Union[go.Figure, bytes]:
     """
     Create an interactive line chart comparing countries over time
     
@@ -20,54 +300,65 @@ def create_line_chart(
         title: Chart title
         y_label: Y-axis label
         height: Chart height in pixels
+        use_webgl: Render traces with WebGL (Scattergl). WebGL traces have no
+            SVG export fidelity, so pass False for publication export.
+        max_points: Per-country point budget; longer series are downsampled
+            with LTTB
+        color_map: Optional country -> color mapping (see make_color_map) so
+            countries keep the same color across figures
+        backend: 'plotly' (default) draws one trace per country. 'datashader'
+            rasterizes the lines server-side into an image, for series too
+            large for the browser even with WebGL; requires datashader.
+        prejson: Return orjson-encoded figure JSON instead of the figure
         
     Returns:
-        Plotly figure object
+        Plotly figure object, or JSON bytes when prejson is set
     """
-    fig = px.line(
-        df,
-        x='year',
-        y='value',
-        color='country',
-        markers=True,
-        title=title,
-        labels={
-            'year': 'Year',
-            'value': y_label,
-            'country': 'Country'
-        },
-        height=height
-    )
+    if backend not in ('plotly', 'datashader'):
+        raise ValueError(f"Unknown chart backend: {backend}")
     
-    fig.update_layout(
-        hovermode='x unified',
-        template='plotly_white',
-        font=dict(size=12),
-        title_font_size=18,
-        legend=dict(
-            orientation="v",
-            yanchor="top",
-            y=1,
-            xanchor="left",
-            x=1.02
-        ),
-        xaxis=dict(
-            showgrid=True,
-            gridcolor='lightgray',
-            dtick=2  # Show every 2 years
-        ),
-        yaxis=dict(
-            showgrid=True,
-            gridcolor='lightgray'
-        )
-    )
+    df = _prep(df)
     
-    fig.update_traces(
-        line=dict(width=2.5),
-        marker=dict(size=6)
+    if df.empty:
+        return _finalize(_empty_fig(title, height), prejson)
+    
+    if backend == 'datashader':
+        fig = _datashader_line_figure(df, height, color_map, max_points)
+    else:
+        color_map = color_map or {}
+        trace_cls = go.Scattergl if use_webgl else go.Scatter
+        fig = go.Figure()
+        
+        for country, country_data in df.groupby('country', sort=False, observed=True):
+            x, y = _lttb(
+                country_data['year'].to_numpy(copy=False),
+                country_data['value'].to_numpy(copy=False),
+                max_points
+            )
+            fig.add_trace(trace_cls(
+                x=x,
+                y=_narrow(y),
+                mode='lines+markers',
+                name=country,
+                line=dict(width=2.5, color=color_map.get(country)),
+                marker=dict(size=6, color=color_map.get(country))
+            ))
+    
+    fig.update_layout(
+        title=title,
+        **_COMMON_LAYOUT,
+        height=height,
+        **_hover_layout(_plotted_points(fig)),
+        legend=_SIDE_LEGEND,
+        legend_title_text='Country',
+        xaxis=_GRID_AXIS,
+        xaxis_title='Year',
+        xaxis_dtick=2,  # Show every 2 years
+        yaxis=_GRID_AXIS,
+        yaxis_title=y_label
     )
     
-    return fig
+    return _finalize(fig, prejson)
 
 
 def create_bar_chart(
@@ -75,8 +366,9 @@ def create_bar_chart(
     year: int,
     title: str,
     y_label: str,
-    height: int = 500
-) -> go.Figure:
+    height: int = 500,
+    prejson: bool = False
+) -> Union[go.Figure, bytes]:
     """
     Create a bar chart comparing countries for a specific year
     
@@ -86,48 +378,91 @@ def create_bar_chart(
         title: Chart title
         y_label: Y-axis label
         height: Chart height in pixels
+        prejson: Return orjson-encoded figure JSON instead of the figure
         
     Returns:
-        Plotly figure object
+        Plotly figure object, or JSON bytes when prejson is set
     """
+    df = _prep(df)
+    
     # Filter data for the specific year
-    df_year = df[df['year'] == year].sort_values('value', ascending=False)
+    df_year = df[df['year'] == year].sort_values('value', ascending=False, kind='mergesort')
     
-    fig = px.bar(
-        df_year,
-        x='country',
-        y='value',
-        color='value',
-        title=f"{title} ({year})",
-        labels={
-            'country': 'Country',
-            'value': y_label
-        },
-        height=height,
-        color_continuous_scale='Viridis'
-    )
+    return _bar_chart_for_year(df_year, year, title, y_label, height, prejson)
+
+
+def make_bar_chart_builder(df: pd.DataFrame) -> Callable[..., Union[go.Figure, bytes]]:
+    """
+    Pre-index data by year for repeated bar charts (e.g. behind a year slider)
     
-    fig.update_layout(
-        template='plotly_white',
-        font=dict(size=12),
-        title_font_size=18,
-        xaxis=dict(
-            tickangle=-45,
-            showgrid=False
-        ),
-        yaxis=dict(
-            showgrid=True,
-            gridcolor='lightgray'
+    Args:
+        df: DataFrame with columns: country, year, value
+        
+    Returns:
+        Function taking (year, title, y_label, height=500, prejson=False) with
+        the same result as create_bar_chart on df, using an O(1) year lookup
+    """
+    df = _prep(df)
+    
+    # Years have small cardinality, so keep one pre-sorted frame per year
+    by_year = {
+        year: group.sort_values('value', ascending=False, kind='mergesort')
+        for year, group in df.groupby('year', sort=False)
+    }
+    empty = df.iloc[0:0]
+    
+    def build(
+        year: int,
+        title: str,
+        y_label: str,
+        height: int = 500,
+        prejson: bool = False
+    ) -> Union[go.Figure, bytes]:
+        return _bar_chart_for_year(by_year.get(year, empty), year, title, y_label, height, prejson)
+    
+    return build
+
+
+def _bar_chart_for_year(
+    df_year: pd.DataFrame,
+    year: int,
+    title: str,
+    y_label: str,
+    height: int,
+    prejson: bool
+) -> Union[go.Figure, bytes]:
+    """Build the bar chart from rows already filtered to year and sorted"""
+    if df_year.empty:
+        return _finalize(_empty_fig(f"{title} ({year})", height), prejson)
+    
+    values = _narrow(df_year['value'].to_numpy(copy=False))
+    
+    # Plotly.js maps the raw values through the colorscale client-side
+    fig = go.Figure(go.Bar(
+        x=df_year['country'].to_numpy(copy=False),
+        y=values,
+        marker=dict(
+            color=values,
+            colorscale='Viridis',
+            showscale=True,
+            colorbar=dict(title=y_label),
+            line=dict(color='rgb(8,48,107)', width=1.5)
         ),
-        showlegend=False
-    )
+        hovertemplate=f"Country=%{{x}}<br>{y_label}=%{{y}}<extra></extra>"
+    ))
     
-    fig.update_traces(
-        marker_line_color='rgb(8,48,107)',
-        marker_line_width=1.5
+    fig.update_layout(
+        title=f"{title} ({year})",
+        **_COMMON_LAYOUT,
+        height=height,
+        xaxis=_CATEGORY_AXIS,
+        xaxis_title='Country',
+        yaxis=_GRID_AXIS,
+        yaxis_title=y_label,
+        showlegend=False
     )
     
-    return fig
+    return _finalize(fig, prejson)
 
 
 def create_comparison_bar_chart(
@@ -135,8 +470,9 @@ def create_comparison_bar_chart(
     years: List[int],
     title: str,
     y_label: str,
-    height: int = 500
-) -> go.Figure:
+    height: int = 500,
+    prejson: bool = False
+) -> Union[go.Figure, bytes]:
     """
     Create a grouped bar chart comparing countries across multiple years
     
@@ -146,13 +482,19 @@ def create_comparison_bar_chart(
         title: Chart title
         y_label: Y-axis label
         height: Chart height in pixels
+        prejson: Return orjson-encoded figure JSON instead of the figure
         
     Returns:
-        Plotly figure object
+        Plotly figure object, or JSON bytes when prejson is set
     """
+    df = _prep(df)
+    
     # Filter data for specified years
     df_filtered = df[df['year'].isin(years)]
     
+    if df_filtered.empty:
+        return _finalize(_empty_fig(title, height), prejson)
+    
     fig = px.bar(
         df_filtered,
         x='country',
@@ -170,17 +512,9 @@ def create_comparison_bar_chart(
     )
     
     fig.update_layout(
-        template='plotly_white',
-        font=dict(size=12),
-        title_font_size=18,
-        xaxis=dict(
-            tickangle=-45,
-            showgrid=False
-        ),
-        yaxis=dict(
-            showgrid=True,
-            gridcolor='lightgray'
-        ),
+        **_COMMON_LAYOUT,
+        xaxis=_CATEGORY_AXIS,
+        yaxis=_GRID_AXIS,
         legend=dict(
             title='Year',
             orientation="h",
@@ -191,14 +525,18 @@ def create_comparison_bar_chart(
         )
     )
     
-    return fig
+    return _finalize(fig, prejson)
 
 
 def create_growth_rate_chart(
     df: pd.DataFrame,
     title: str,
-    height: int = 500
-) -> go.Figure:
+    height: int = 500,
+    use_webgl: bool = True,
+    max_points: int = 2000,
+    color_map: Optional[Dict[str, str]] = None,
+    prejson: bool = False
+) -> Union[go.Figure, bytes]:
     """
     Create a chart showing year-over-year growth rates
     
@@ -206,36 +544,51 @@ def create_growth_rate_chart(
         df: DataFrame with columns: country, year, value
         title: Chart title
         height: Chart height in pixels
+        use_webgl: Render traces with WebGL (Scattergl); pass False for SVG
+        max_points: Per-country point budget; longer series are downsampled
+            with LTTB
+        color_map: Optional country -> color mapping (see make_color_map) so
+            countries keep the same color across figures
+        prejson: Return orjson-encoded figure JSON instead of the figure
         
     Returns:
-        Plotly figure object
+        Plotly figure object, or JSON bytes when prejson is set
     """
-    # Calculate growth rates
-    growth_data = []
-    
-    for country in df['country'].unique():
-        country_data = df[df['country'] == country].sort_values('year')
-        country_data = country_data.copy()
-        country_data['growth_rate'] = country_data['value'].pct_change() * 100
-        growth_data.append(country_data)
-    
-    df_growth = pd.concat(growth_data, ignore_index=True)
-    df_growth = df_growth.dropna(subset=['growth_rate'])
-    
-    fig = px.line(
-        df_growth,
-        x='year',
-        y='growth_rate',
-        color='country',
-        markers=True,
-        title=title,
-        labels={
-            'year': 'Year',
-            'growth_rate': 'Growth Rate (%)',
-            'country': 'Country'
-        },
-        height=height
-    )
+    df = _prep(df)
+    
+    # Calculate growth rates in one contiguous NumPy pass over a stably sorted
+    # frame, blanking the first row of each country where the codes change
+    df_sorted = df.sort_values(['country', 'year'], kind='mergesort')
+    v = df_sorted['value'].to_numpy(dtype=float)
+    codes = df_sorted['country'].cat.codes.to_numpy()
+    gr = np.empty_like(v)
+    gr[:1] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gr[1:] = np.where(codes[1:] != codes[:-1], np.nan, (v[1:] / v[:-1] - 1.0) * 100.0)
+    
+    df_growth = df_sorted.assign(growth_rate=gr).dropna(subset=['growth_rate'])
+    
+    if df_growth.empty:
+        return _finalize(_empty_fig(title, height), prejson)
+    
+    color_map = color_map or {}
+    trace_cls = go.Scattergl if use_webgl else go.Scatter
+    fig = go.Figure()
+    
+    for country, country_data in df_growth.groupby('country', sort=False, observed=True):
+        x, y = _lttb(
+            country_data['year'].to_numpy(copy=False),
+            country_data['growth_rate'].to_numpy(copy=False),
+            max_points
+        )
+        fig.add_trace(trace_cls(
+            x=x,
+            y=_narrow(y),
+            mode='lines+markers',
+            name=country,
+            line=dict(width=2.5, color=color_map.get(country)),
+            marker=dict(size=6, color=color_map.get(country))
+        ))
     
     # Add horizontal line at y=0
     fig.add_hline(
@@ -247,36 +600,19 @@ def create_growth_rate_chart(
     )
     
     fig.update_layout(
-        hovermode='x unified',
-        template='plotly_white',
-        font=dict(size=12),
-        title_font_size=18,
-        legend=dict(
-            orientation="v",
-            yanchor="top",
-            y=1,
-            xanchor="left",
-            x=1.02
-        ),
-        xaxis=dict(
-            showgrid=True,
-            gridcolor='lightgray'
-        ),
-        yaxis=dict(
-            showgrid=True,
-            gridcolor='lightgray',
-            zeroline=True,
-            zerolinecolor='red',
-            zerolinewidth=1
-        )
-    )
-    
-    fig.update_traces(
-        line=dict(width=2.5),
-        marker=dict(size=6)
+        title=title,
+        **_COMMON_LAYOUT,
+        height=height,
+        **_hover_layout(_plotted_points(fig)),
+        legend=_SIDE_LEGEND,
+        legend_title_text='Country',
+        xaxis=_GRID_AXIS,
+        xaxis_title='Year',
+        yaxis=_ZERO_LINE_AXIS,
+        yaxis_title='Growth Rate (%)'
     )
     
-    return fig
+    return _finalize(fig, prejson)
 
 
 def create_prediction_chart(
@@ -284,8 +620,11 @@ def create_prediction_chart(
     predictions: pd.DataFrame,
     title: str,
     y_label: str,
-    height: int = 500
-) -> go.Figure:
+    height: int = 500,
+    use_webgl: bool = True,
+    color_map: Optional[Dict[str, str]] = None,
+    prejson: bool = False
+) -> Union[go.Figure, bytes]:
     """
     Create a chart showing historical data with predictions
     
@@ -295,62 +634,157 @@ def create_prediction_chart(
         title: Chart title
         y_label: Y-axis label
         height: Chart height in pixels
+        use_webgl: Render traces with WebGL (Scattergl); pass False for SVG
+        color_map: Optional country -> color mapping (see make_color_map) so
+            countries keep the same color across figures
+        prejson: Return orjson-encoded figure JSON instead of the figure
         
     Returns:
-        Plotly figure object
+        Plotly figure object, or JSON bytes when prejson is set
     """
-    fig = go.Figure()
+    df = _prep(df)
+    predictions = _prep(predictions)
     
-    # Add historical data
-    for country in df['country'].unique():
-        country_data = df[df['country'] == country].sort_values('year')
-        
-        fig.add_trace(go.Scatter(
-            x=country_data['year'],
-            y=country_data['value'],
+    if df.empty and predictions.empty:
+        return _finalize(_empty_fig(title, height), prejson)
+    
+    color_map = color_map or {}
+    trace_cls = go.Scattergl if use_webgl else go.Scatter
+    traces = []
+    
+    # Historical data (one sort, then one groupby pass over countries)
+    df_sorted = df.sort_values('year', kind='mergesort')
+    for country, country_data in df_sorted.groupby('country', sort=False, observed=True):
+        traces.append(trace_cls(
+            x=country_data['year'].to_numpy(copy=False),
+            y=_narrow(country_data['value'].to_numpy(copy=False)),
             mode='lines+markers',
             name=f"{country} (Historical)",
-            line=dict(width=2.5),
-            marker=dict(size=6)
+            line=dict(width=2.5, color=color_map.get(country)),
+            marker=dict(size=6, color=color_map.get(country))
         ))
     
-    # Add predictions
-    for country in predictions['country'].unique():
-        pred_data = predictions[predictions['country'] == country]
-        
-        fig.add_trace(go.Scatter(
-            x=pred_data['year'],
-            y=pred_data['value'],
+    # Predictions
+    pred_sorted = predictions.sort_values('year', kind='mergesort')
+    for country, pred_data in pred_sorted.groupby('country', sort=False, observed=True):
+        traces.append(trace_cls(
+            x=pred_data['year'].to_numpy(copy=False),
+            y=_narrow(pred_data['value'].to_numpy(copy=False)),
             mode='lines+markers',
             name=f"{country} (Predicted)",
-            line=dict(width=2.5, dash='dash'),
-            marker=dict(size=8, symbol='star')
+            line=dict(width=2.5, dash='dash', color=color_map.get(country)),
+            marker=dict(size=8, symbol='star', color=color_map.get(country))
         ))
     
+    # Hand all traces to the figure at once rather than one add_trace per country
+    fig = go.Figure(data=traces)
+    
     fig.update_layout(
         title=title,
-        xaxis_title='Year',
-        yaxis_title=y_label,
+        **_COMMON_LAYOUT,
         height=height,
-        hovermode='x unified',
-        template='plotly_white',
-        font=dict(size=12),
-        title_font_size=18,
-        legend=dict(
-            orientation="v",
-            yanchor="top",
-            y=1,
-            xanchor="left",
-            x=1.02
-        ),
-        xaxis=dict(
-            showgrid=True,
-            gridcolor='lightgray'
-        ),
-        yaxis=dict(
-            showgrid=True,
-            gridcolor='lightgray'
-        )
+        **_hover_layout(_plotted_points(fig)),
+        legend=_SIDE_LEGEND,
+        xaxis=_GRID_AXIS,
+        xaxis_title='Year',
+        yaxis=_GRID_AXIS,
+        yaxis_title=y_label
     )
     
-    return fig
+    return _finalize(fig, prejson)
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _cache_key(value):
+    """
+    Hashable key for a chart builder argument, derived from its content
+    
+    DataFrames, Series and ndarrays are reduced to a digest of their values so
+    the key holds no reference to the data itself. Dicts (e.g. color_map),
+    lists and tuples (e.g. years) are keyed by their items. Any other
+    unhashable argument raises TypeError.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest = _digest(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+        if isinstance(value, pd.DataFrame):
+            return ('DataFrame', tuple(value.columns), tuple(map(str, value.dtypes)), digest)
+        return ('Series', value.name, str(value.dtype), digest)
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            # Object arrays hold pointers; hash the referenced values instead
+            data = pd.util.hash_pandas_object(pd.Series(value.ravel()), index=False).to_numpy()
+        else:
+            data = np.ascontiguousarray(value)
+        return ('ndarray', value.dtype.str, value.shape, _digest(data.tobytes()))
+    if isinstance(value, dict):
+        return ('dict', frozenset((k, _cache_key(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_cache_key(v) for v in value))
+    try:
+        hash(value)
+    except TypeError:
+        raise TypeError(f"Unsupported chart argument type for caching: {type(value).__name__}")
+    return value
+
+
+# Keys hold only digests, so the original inputs are passed to the builder
+# alongside the key instead of being kept alive by the cache
+_FIGURE_CACHE: "OrderedDict[tuple, bytes]" = OrderedDict()
+_FIGURE_CACHE_SIZE = 128
+_FIGURE_CACHE_LOCK = threading.Lock()
+
+
+def cached_figure_json(builder: Callable, *args, **kwargs) -> bytes:
+    """
+    Build a chart as orjson-encoded JSON, memoized on the content of its inputs
+    
+    DataFrames, Series and arrays are keyed by a hash of their values, so
+    identical data with the same parameters returns the cached JSON without
+    rebuilding the figure.
+    
+    Args:
+        builder: One of the create_* chart functions in this module
+        *args: Positional arguments for the builder
+        **kwargs: Keyword arguments for the builder (except prejson)
+        
+    Returns:
+        Figure JSON bytes
+    """
+    if _BUILDERS.get(builder.__name__) is not builder:
+        raise ValueError(f"Unsupported chart builder: {builder.__name__}")
+    
+    key = (
+        builder.__name__,
+        tuple(_cache_key(a) for a in args),
+        tuple(sorted((k, _cache_key(v)) for k, v in kwargs.items()))
+    )
+    
+    # Streamlit runs sessions on separate threads
+    with _FIGURE_CACHE_LOCK:
+        cached = _FIGURE_CACHE.get(key)
+        if cached is not None:
+            _FIGURE_CACHE.move_to_end(key)
+            return cached
+    
+    result = builder(*args, **kwargs, prejson=True)
+    
+    with _FIGURE_CACHE_LOCK:
+        _FIGURE_CACHE[key] = result
+        if len(_FIGURE_CACHE) > _FIGURE_CACHE_SIZE:
+            _FIGURE_CACHE.popitem(last=False)
+    return result
+
+
+_BUILDERS = {
+    fn.__name__: fn
+    for fn in (
+        create_line_chart,
+        create_bar_chart,
+        create_comparison_bar_chart,
+        create_growth_rate_chart,
+        create_prediction_chart
+    )
+}